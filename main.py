@@ -1,12 +1,38 @@
 # main.py
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
+from fastapi.responses import Response
+import PIL
 from PIL import Image, ImageDraw, ImageFont
+import asyncio
 import io
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import numpy as np
 from pathlib import Path
-from typing import Optional
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
+import logging
 import re
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# libjpeg-turbo's TurboJPEG API decodes/encodes JPEGs straight from/to NumPy arrays.
+# Fall back to Pillow when the shared library is not installed.
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJSAMP_420
+    _turbo_jpeg = TurboJPEG()
+except (ImportError, RuntimeError, OSError):
+    _turbo_jpeg = None
+
+# Numba compiles the box blend to native code; the NumPy version is used without it
+try:
+    import numba
+except ImportError:
+    numba = None
+
 app = FastAPI(
     title="Image Overlay Service",
     description="Add quotes with translucent overlays to images",
@@ -16,67 +42,99 @@ app = FastAPI(
 # Directory where fonts are stored (committed to repo)
 FONTS_DIR = Path(__file__).parent / "fonts"
 
-# Cache for discovered fonts
-_font_cache = {}
+# Maximum number of loaded fonts kept in memory. Font sizes follow the uploaded
+# image's width, so the cache is bounded rather than growing with every new width.
+FONT_CACHE_SIZE = 256
+
+# Worker threads for the CPU-bound image processing, created on startup.
+# Pillow releases the GIL in its C image operations, so requests run in parallel.
+_executor: Optional[ThreadPoolExecutor] = None
 
+# Common image widths whose font sizes are pre-loaded on startup
+PRELOAD_IMAGE_WIDTHS = (640, 800, 1024, 1080, 1280, 1600, 1920, 2048, 2560, 3840, 4096)
 
-def discover_fonts() -> dict:
+
+def _discover_fonts() -> dict:
     """
     Discover all fonts in the fonts directory that match *-Regular.ttf pattern.
     Returns a dict mapping font names to filenames.
     """
-    if _font_cache:
-        return _font_cache
-
-    print(f"\n=== FONT DISCOVERY DEBUG ===")
-    print(f"Looking for fonts in: {FONTS_DIR}")
-    print(f"FONTS_DIR exists: {FONTS_DIR.exists()}")
-    print(f"FONTS_DIR absolute path: {FONTS_DIR.absolute()}")
+    logger.debug("Looking for fonts in: %s", FONTS_DIR.absolute())
 
     if not FONTS_DIR.exists():
-        print(f"Creating fonts directory...")
-        FONTS_DIR.mkdir(parents=True, exist_ok=True)
+        logger.warning("Fonts directory does not exist: %s", FONTS_DIR.absolute())
         return {}
 
     # List all files in the directory
-    print(f"\nAll files in fonts directory:")
-    for item in FONTS_DIR.iterdir():
-        print(f"  - {item.name} (is_file: {item.is_file()})")
+    if logger.isEnabledFor(logging.DEBUG):
+        for item in FONTS_DIR.iterdir():
+            logger.debug("Fonts directory entry: %s (is_file: %s)", item.name, item.is_file())
 
     fonts = {}
 
     # Find all *-Regular.ttf files
-    print(f"\nSearching for *-Regular.ttf files:")
     for font_file in FONTS_DIR.glob("*-Regular.ttf"):
         # Extract font name from filename
         # e.g., "PlayfairDisplay-Regular.ttf" -> "playfairdisplay"
         font_name = font_file.stem.replace("-Regular", "").lower()
         fonts[font_name] = font_file.name
-        print(f"  Found: {font_file.name} -> {font_name}")
+        logger.debug("Found font: %s -> %s", font_file.name, font_name)
 
     # Also check for *Regular.ttf (without hyphen) like "OpenSansRegular.ttf"
-    print(f"\nSearching for *Regular.ttf files (no hyphen):")
     for font_file in FONTS_DIR.glob("*Regular.ttf"):
         if not font_file.name.endswith("-Regular.ttf"):  # Skip ones we already got
             font_name = font_file.stem.replace("Regular", "").lower()
             fonts[font_name] = font_file.name
-            print(f"  Found: {font_file.name} -> {font_name}")
+            logger.debug("Found font: %s -> %s", font_file.name, font_name)
 
-    print(f"\nTotal fonts discovered: {len(fonts)}")
-    print(f"Font mapping: {fonts}")
-    print(f"=== END FONT DISCOVERY ===\n")
-
-    _font_cache.update(fonts)
+    logger.debug("Discovered %d fonts: %s", len(fonts), fonts)
     return fonts
 
 
+# Fonts are discovered once at import and never change while the service runs
+FONTS: Mapping[str, str] = MappingProxyType(_discover_fonts())
+_FONT_SET = frozenset(FONTS)
+_FONT_NAMES_CSV = ', '.join(FONTS.keys())
+_DEFAULT_FONT = "opensans" if "opensans" in _FONT_SET else next(iter(FONTS), "opensans")
+
+
+def discover_fonts() -> Mapping[str, str]:
+    """
+    Return the fonts discovered at import, mapping font names to filenames.
+    Kept for compatibility; use FONTS directly.
+    """
+    return FONTS
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Discover fonts on startup."""
-    fonts = discover_fonts()
-    print(f"\n*** SERVICE STARTED ***")
-    print(f"Discovered {len(fonts)} fonts: {', '.join(fonts.keys()) if fonts else 'NONE'}")
-    print(f"*** *** *** *** *** ***\n")
+    """Pre-load fonts at common sizes and start the worker threads on startup."""
+    global _executor
+    _executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="overlay")
+
+    # Compile (or load the cached) blend kernel before the first request needs it
+    _blend_const_grey(np.zeros((1, 1, 3), dtype=np.uint8))
+
+    for font_name in FONTS:
+        for width in PRELOAD_IMAGE_WIDTHS:
+            for size in get_font_sizes(width):
+                get_font(size, font_name)
+    logger.info("Service started, discovered %d fonts: %s", len(FONTS), _FONT_NAMES_CSV or 'NONE')
+    # Pillow-SIMD releases are versioned as <pillow version>.postN
+    if ".post" in PIL.__version__:
+        logger.info("Using Pillow-SIMD %s", PIL.__version__)
+    else:
+        logger.warning("Pillow-SIMD not loaded (Pillow %s), compositing and JPEG encode are not vectorized",
+                       PIL.__version__)
+    if _turbo_jpeg is None:
+        logger.warning("TurboJPEG library not found, JPEGs are decoded and encoded through Pillow")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the worker threads on shutdown."""
+    if _executor is not None:
+        _executor.shutdown(wait=True)
 
 
 @app.get("/")
@@ -98,10 +156,8 @@ async def health():
 @app.get("/fonts")
 async def list_fonts():
     """List all available fonts discovered in the fonts directory."""
-    fonts = discover_fonts()
-
     available_fonts = {}
-    for font_name, filename in fonts.items():
+    for font_name, filename in FONTS.items():
         font_path = FONTS_DIR / filename
         available_fonts[font_name] = {
             "name": font_name,
@@ -110,7 +166,7 @@ async def list_fonts():
             "absolute_path": str(font_path.absolute())
         }
 
-    default = "opensans" if "opensans" in fonts else (list(fonts.keys())[0] if fonts else None)
+    default = _DEFAULT_FONT if FONTS else None
 
     return {
         "fonts": available_fonts,
@@ -128,56 +184,61 @@ async def debug_fonts():
         "fonts_dir_exists": FONTS_DIR.exists(),
         "parent_dir": str(FONTS_DIR.parent.absolute()),
         "files_in_fonts_dir": [f.name for f in FONTS_DIR.iterdir()] if FONTS_DIR.exists() else [],
-        "discovered_fonts": discover_fonts(),
-        "cache": _font_cache
+        "discovered_fonts": dict(FONTS)
     }
 
 
+def get_font_sizes(img_width: int) -> tuple:
+    """
+    Font sizes for an image of the given width, scaled with the image.
+    Returns (quote_font_size, attribution_font_size).
+    """
+    return max(24, int(img_width * 0.03)), max(18, int(img_width * 0.022))
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
 def get_font(size: int, font_name: str = "opensans") -> ImageFont.FreeTypeFont:
     """
     Load a font by name, fallback to system fonts if not available.
+    The most recently used FONT_CACHE_SIZE fonts are cached by (size, font_name).
 
     Args:
         size: Font size in pixels
         font_name: Name of the font to use
     """
-    print(f"\n--- GET FONT DEBUG ---")
-    print(f"Requested font: {font_name}, size: {size}")
+    return _load_font(size, font_name)
+
 
-    fonts = discover_fonts()
-    print(f"Available fonts: {list(fonts.keys())}")
+def _load_font(size: int, font_name: str) -> ImageFont.FreeTypeFont:
+    """Load a font from disk without caching. See get_font."""
+    logger.debug("Loading font: %s, size: %d", font_name, size)
 
     # Try to load the requested font
-    if font_name in fonts:
-        font_path = FONTS_DIR / fonts[font_name]
-        print(f"Font found in cache: {fonts[font_name]}")
-        print(f"Full path: {font_path.absolute()}")
-        print(f"File exists: {font_path.exists()}")
+    if font_name in _FONT_SET:
+        font_path = FONTS_DIR / FONTS[font_name]
 
         if font_path.exists():
             try:
-                font = ImageFont.truetype(str(font_path), size)
-                print(f"✓ Successfully loaded font: {font_name}")
-                return font
+                return ImageFont.truetype(str(font_path), size)
             except Exception as e:
-                print(f"✗ Error loading font {font_name}: {e}")
+                logger.warning("Error loading font %s: %s", font_name, e)
+        else:
+            logger.warning("Font file missing: %s", font_path.absolute())
     else:
-        print(f"✗ Font '{font_name}' not found in available fonts")
+        logger.debug("Font '%s' not found in available fonts", font_name)
 
     # If requested font not found, try to use any available font
-    if fonts:
-        first_font = list(fonts.keys())[0]
-        font_path = FONTS_DIR / fonts[first_font]
-        print(f"Trying first available font: {first_font}")
+    if FONTS:
+        first_font = next(iter(FONTS))
+        font_path = FONTS_DIR / FONTS[first_font]
         try:
             font = ImageFont.truetype(str(font_path), size)
-            print(f"✓ Loaded fallback font: {first_font}")
+            logger.debug("Loaded fallback font: %s", first_font)
             return font
         except Exception as e:
-            print(f"✗ Error loading fallback font {first_font}: {e}")
+            logger.warning("Error loading fallback font %s: %s", first_font, e)
 
     # Fallback to system fonts
-    print("Falling back to system fonts...")
     font_paths = [
         "/System/Library/Fonts/Supplemental/Arial.ttf",  # macOS
         "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Linux
@@ -187,37 +248,82 @@ def get_font(size: int, font_name: str = "opensans") -> ImageFont.FreeTypeFont:
     for font_path in font_paths:
         try:
             font = ImageFont.truetype(font_path, size)
-            print(f"✓ Loaded system font: {font_path}")
+            logger.debug("Loaded system font: %s", font_path)
             return font
         except:
-            print(f"✗ System font not found: {font_path}")
             continue
 
     # Last resort fallback
-    print("✓ Using PIL default font")
+    logger.warning("No usable font found, using PIL default font")
     return ImageFont.load_default()
 
 
-def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, draw: ImageDraw.ImageDraw) -> list:
+if numba is not None:
+    @numba.njit(cache=True, nogil=True)
+    def _blend_box(roi, r, g, b, alpha):
+        """Compiled kernel for _blend_const_grey: one fused pass over all three channels."""
+        inv_alpha = 255 - alpha
+        r, g, b = r * alpha + 128, g * alpha + 128, b * alpha + 128
+        for y in range(roi.shape[0]):
+            for x in range(roi.shape[1]):
+                t = roi[y, x, 0] * inv_alpha + r
+                roi[y, x, 0] = (t + (t >> 8)) >> 8
+                t = roi[y, x, 1] * inv_alpha + g
+                roi[y, x, 1] = (t + (t >> 8)) >> 8
+                t = roi[y, x, 2] * inv_alpha + b
+                roi[y, x, 2] = (t + (t >> 8)) >> 8
+else:
+    _blend_box = None
+
+
+def _blend_const_grey(roi: np.ndarray, color: tuple = (128, 128, 128), alpha: int = 153) -> None:
+    """
+    Blend a constant color with the given opacity into an opaque RGB region, in place.
+    Over an opaque destination, alpha compositing reduces to a per-channel lerp:
+    out = (src * (255 - alpha) + color * alpha) / 255, rounded, with uint16 intermediates.
+
+    Args:
+        roi: uint8 array (or view) of shape (height, width, 3)
+        color: RGB color of the overlay
+        alpha: Opacity of the overlay, 0-255
+    """
+    if _blend_box is not None:
+        _blend_box(roi, color[0], color[1], color[2], alpha)
+        return
+
+    blended = roi.astype(np.uint16)
+    blended *= 255 - alpha
+    blended += np.array(color, dtype=np.uint16) * alpha + 128
+    blended += blended >> 8  # exact rounding division by 255
+    blended >>= 8
+    roi[...] = blended
+
+
+def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list:
     """
     Wrap text to fit within max_width.
+    Each word is measured once and line widths are tracked as a running sum.
     Returns list of lines.
     """
     words = text.split()
     lines = []
     current_line = []
+    current_width = 0
+    space_width = font.getlength(' ')
 
     for word in words:
-        test_line = ' '.join(current_line + [word])
-        bbox = draw.textbbox((0, 0), test_line, font=font)
-        width = bbox[2] - bbox[0]
+        word_width = font.getlength(word)
 
-        if width <= max_width:
+        if not current_line:
+            current_line.append(word)
+            current_width = word_width
+        elif current_width + space_width + word_width <= max_width:
             current_line.append(word)
+            current_width += space_width + word_width
         else:
-            if current_line:
-                lines.append(' '.join(current_line))
+            lines.append(' '.join(current_line))
             current_line = [word]
+            current_width = word_width
 
     if current_line:
         lines.append(' '.join(current_line))
@@ -225,57 +331,54 @@ def wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int, draw: Ima
     return lines
 
 
-def add_translucent_box_with_text(
-        image: Image.Image,
-        quote: str,
-        attribution: str,
-        font_name: str = "opensans"
-) -> Image.Image:
-    """
-    Add a translucent box overlay with quote and attribution text.
-    Box is 80% of image width, centered, with height based on text content.
+class _BoxLayout(NamedTuple):
+    """Position of the translucent box and the text drawn inside it."""
+    x: int
+    y: int
+    width: int
+    height: int
+    quote_text: str
+    quote_font: ImageFont.FreeTypeFont
+    quote_spacing: int
+    quote_xy: tuple
+    attribution_text: str
+    attribution_font: ImageFont.FreeTypeFont
+    attribution_xy: tuple
 
-    Args:
-        image: PIL Image object
-        quote: Quote text to display
-        attribution: Attribution text to display
-        font_name: Name of the font to use
+    def region(self, img_width: int, img_height: int) -> tuple:
+        """The box clipped to the image, as (x0, y0, x1, y1)."""
+        return (max(self.x, 0), max(self.y, 0),
+                min(self.x + self.width, img_width), min(self.y + self.height, img_height))
 
-    Returns:
-        Modified PIL Image object with translucent box and text
-    """
-    # Get image dimensions
-    img_width, img_height = image.size
 
+def _layout_box(img_width: int, img_height: int, quote: str, attribution: str, font_name: str) -> _BoxLayout:
+    """
+    Lay out the box and its text for an image of the given size.
+    Box is 80% of image width, centered, with height based on text content.
+    """
     # Calculate box dimensions
     box_width = int(img_width * 0.8)
     box_padding = 40  # Padding inside the box
 
     # Create fonts
-    quote_font_size = max(24, int(img_width * 0.03))  # Scale with image size
-    attribution_font_size = max(18, int(img_width * 0.022))
+    quote_font_size, attribution_font_size = get_font_sizes(img_width)
 
     quote_font = get_font(quote_font_size, font_name)
     attribution_font = get_font(attribution_font_size, font_name)
 
-    # Create a temporary draw object to calculate text size
-    temp_img = Image.new('RGBA', (1, 1))
-    temp_draw = ImageDraw.Draw(temp_img)
-
     # Wrap quote text
     max_text_width = box_width - (box_padding * 2)
-    quote_lines = wrap_text(quote, quote_font, max_text_width, temp_draw)
+    quote_lines = wrap_text(quote, quote_font, max_text_width)
 
-    # Calculate total text height
+    # Calculate total text height from the font's line metrics
     line_spacing = 10
-    quote_height = 0
-    for line in quote_lines:
-        bbox = temp_draw.textbbox((0, 0), line, font=quote_font)
-        quote_height += (bbox[3] - bbox[1]) + line_spacing
+    ascent, descent = quote_font.getmetrics()
+    line_height = ascent + descent
+    quote_height = len(quote_lines) * (line_height + line_spacing)
 
-    # Attribution height
-    attr_bbox = temp_draw.textbbox((0, 0), f"— {attribution}", font=attribution_font)
-    attribution_height = attr_bbox[3] - attr_bbox[1]
+    # Attribution height, from the font's line metrics
+    attr_ascent, attr_descent = attribution_font.getmetrics()
+    attribution_height = attr_ascent + attr_descent
 
     # Calculate total box height
     box_height = quote_height + attribution_height + (box_padding * 2) + 20  # Extra space between quote and attribution
@@ -284,54 +387,218 @@ def add_translucent_box_with_text(
     box_x = (img_width - box_width) // 2
     box_y = (img_height - box_height) // 2
 
-    # Create a copy of the image to work with
-    result_image = image.copy()
+    return _BoxLayout(
+        x=box_x,
+        y=box_y,
+        width=box_width,
+        height=box_height,
+        quote_text='\n'.join(quote_lines),
+        quote_font=quote_font,
+        # multiline_text advances lines by the ascent plus spacing
+        quote_spacing=descent + line_spacing,
+        # Quote lines are centered horizontally, attribution is right-aligned
+        quote_xy=(box_x + box_width // 2, box_y + box_padding),
+        attribution_text=f"— {attribution}",
+        attribution_font=attribution_font,
+        attribution_xy=(box_x + box_width - box_padding, box_y + box_padding + quote_height + 20)
+    )
 
-    # Create a transparent overlay
-    overlay = Image.new('RGBA', image.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
 
-    # Draw the translucent grey box (128, 128, 128 with 60% opacity)
-    draw.rectangle(
-        [box_x, box_y, box_x + box_width, box_y + box_height],
-        fill=(128, 128, 128, 153)
+def _draw_box_text(draw: ImageDraw.ImageDraw, layout: _BoxLayout, offset: tuple = (0, 0)) -> None:
+    """Draw the quote and attribution, shifted by offset (for drawing onto a crop of the image)."""
+    dx, dy = offset
+    draw.multiline_text(
+        (layout.quote_xy[0] + dx, layout.quote_xy[1] + dy),
+        layout.quote_text,
+        fill=(0, 0, 0, 255),
+        font=layout.quote_font,
+        anchor='ma',
+        spacing=layout.quote_spacing,
+        align='center'
+    )
+    draw.text(
+        (layout.attribution_xy[0] + dx, layout.attribution_xy[1] + dy),
+        layout.attribution_text,
+        fill=(0, 0, 0, 255),
+        font=layout.attribution_font,
+        anchor='ra'
     )
 
-    # Convert original image to RGBA if needed
-    if result_image.mode != 'RGBA':
-        result_image = result_image.convert('RGBA')
 
-    # Composite the overlay onto the image
-    result_image = Image.alpha_composite(result_image, overlay)
+def add_translucent_box_with_text(
+        image: Image.Image,
+        quote: str,
+        attribution: str,
+        font_name: str = "opensans"
+) -> Image.Image:
+    """
+    Add a translucent box overlay with quote and attribution text.
+    Box is 80% of image width, centered, with height based on text content.
+    RGB images are modified in place rather than copied.
+
+    Args:
+        image: PIL Image object (modified in place if it is RGB)
+        quote: Quote text to display
+        attribution: Attribution text to display
+        font_name: Name of the font to use
+
+    Returns:
+        Modified PIL Image object with translucent box and text
+    """
+    img_width, img_height = image.size
+    layout = _layout_box(img_width, img_height, quote, attribution, font_name)
+
+    # Draw directly onto the image; non-RGB sources get a single converted copy below
+    result_image = image
+
+    # Work in RGB throughout; flatten transparent sources onto white up front
+    # (equivalent to compositing first and flattening afterwards)
+    if result_image.mode != 'RGB':
+        if 'A' in result_image.getbands() or 'transparency' in result_image.info:
+            rgba = result_image.convert('RGBA')
+            result_image = Image.new('RGB', rgba.size, (255, 255, 255))
+            result_image.paste(rgba, mask=rgba.getchannel('A'))
+        else:
+            result_image = result_image.convert('RGB')
+
+    # Blend the translucent grey box (128, 128, 128 with 60% opacity) into the box region only
+    x0, y0, x1, y1 = layout.region(img_width, img_height)
+    roi = np.array(result_image.crop((x0, y0, x1, y1)))
+    _blend_const_grey(roi, color=(128, 128, 128), alpha=153)
+    result_image.paste(Image.fromarray(roi), (x0, y0))
 
     # Now draw the text on top
-    draw = ImageDraw.Draw(result_image)
+    _draw_box_text(ImageDraw.Draw(result_image), layout)
+
+    return result_image
 
-    # Draw quote lines
-    current_y = box_y + box_padding
-    for line in quote_lines:
-        # Center each line horizontally
-        bbox = draw.textbbox((0, 0), line, font=quote_font)
-        line_width = bbox[2] - bbox[0]
-        line_x = box_x + (box_width - line_width) // 2
 
-        draw.text((line_x, current_y), line, fill=(0, 0, 0, 255), font=quote_font)
-        current_y += (bbox[3] - bbox[1]) + line_spacing
+def add_translucent_box_with_text_array(
+        arr: np.ndarray,
+        quote: str,
+        attribution: str,
+        font_name: str = "opensans"
+) -> None:
+    """
+    Same as add_translucent_box_with_text, for an RGB uint8 array modified in place.
+    The text stays inside the box, so only the box region is copied into a PIL image
+    for drawing the text; the rest of the array is never copied.
 
-    # Draw attribution (right-aligned)
-    attribution_text = f"— {attribution}"
-    attr_bbox = draw.textbbox((0, 0), attribution_text, font=attribution_font)
-    attr_width = attr_bbox[2] - attr_bbox[0]
-    attr_x = box_x + box_width - attr_width - box_padding  # Right-aligned
-    attr_y = current_y + 20
+    Args:
+        arr: uint8 array of shape (height, width, 3)
+        quote: Quote text to display
+        attribution: Attribution text to display
+        font_name: Name of the font to use
+    """
+    img_height, img_width = arr.shape[:2]
+    layout = _layout_box(img_width, img_height, quote, attribution, font_name)
 
-    draw.text((attr_x, attr_y), attribution_text, fill=(0, 0, 0, 255), font=attribution_font)
+    x0, y0, x1, y1 = layout.region(img_width, img_height)
+    roi = arr[y0:y1, x0:x1]
+    _blend_const_grey(roi, color=(128, 128, 128), alpha=153)
 
-    return result_image
+    roi_image = Image.fromarray(roi)
+    _draw_box_text(ImageDraw.Draw(roi_image), layout, offset=(-x0, -y0))
+    roi[...] = np.asarray(roi_image)
+
+
+def _decode_jpeg(image_file) -> Optional[np.ndarray]:
+    """
+    Decode a JPEG upload straight to an RGB array with TurboJPEG.
+    Returns None when TurboJPEG is not available, for non-JPEG uploads and for
+    JPEGs TurboJPEG cannot decode to RGB (e.g. CMYK); Pillow handles those.
+    """
+    if _turbo_jpeg is None:
+        return None
+    is_jpeg = image_file.read(3) == b'\xff\xd8\xff'
+    image_file.seek(0)
+    if not is_jpeg:
+        return None
+
+    try:
+        # Map the upload's temporary file instead of reading a second copy into memory
+        buffer = mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        buffer = image_file.read()
+        image_file.seek(0)
+    try:
+        return _turbo_jpeg.decode(buffer, pixel_format=TJPF_RGB)
+    except OSError:
+        return None
+    finally:
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+
+
+def render_overlay(
+        image_file,
+        quote: str,
+        attribution: str,
+        font_name: str,
+        output_format: str = "JPEG"
+) -> bytes:
+    """
+    Decode an image, add the quote overlay and encode the result.
+    Runs on a worker thread, see create_overlay.
+
+    Args:
+        image_file: File-like object containing the source image
+        quote: Quote text to display
+        attribution: Attribution text to display
+        font_name: Name of the font to use
+        output_format: "JPEG" or "WEBP"
+
+    Returns:
+        Encoded image bytes
+    """
+    # JPEGs decoded by TurboJPEG stay in the decoded array for JPEG output
+    arr = _decode_jpeg(image_file)
+    if arr is not None:
+        add_translucent_box_with_text_array(arr, quote, attribution, font_name)
+        if output_format == "JPEG":
+            return _turbo_jpeg.encode(arr, quality=85, pixel_format=TJPF_RGB, jpeg_subsample=TJSAMP_420)
+        result_img = Image.fromarray(arr)
+    else:
+        # Add the translucent box with text
+        result_img = add_translucent_box_with_text(Image.open(image_file), quote, attribution, font_name)
+
+    # Save to bytes
+    img_byte_arr = io.BytesIO()
+    if output_format == "WEBP":
+        # WebP at q80 is noticeably smaller than JPEG at equal visual quality
+        result_img.save(img_byte_arr, format='WEBP', quality=80, method=4)
+    else:
+        # q85 with 4:2:0 chroma subsampling is visually indistinguishable from q95 for
+        # photos and much smaller; a single-pass baseline encode keeps libjpeg-turbo fast
+        result_img.save(img_byte_arr, format='JPEG', quality=85, subsampling=2, optimize=False, progressive=False)
+    return img_byte_arr.getvalue()
+
+
+def accepts_media_type(accept: str, media_type: str) -> bool:
+    """
+    Check whether an Accept header explicitly lists media_type with a non-zero quality.
+    Wildcards are ignored, so "*/*" does not count as accepting media_type.
+    """
+    for media_range in accept.split(","):
+        name, *params = (part.strip() for part in media_range.split(";"))
+        if name.lower() != media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            return True
+    return False
 
 
 @app.post("/overlay")
 async def create_overlay(
+        request: Request,
         image: UploadFile = File(..., description="Image file to overlay quote on"),
         quote: str = Form(..., description="Quote text to overlay"),
         attribution: str = Form(..., description="Attribution for the quote"),
@@ -340,55 +607,45 @@ async def create_overlay(
 ):
     """
     Add a quote overlay to an image with a translucent grey box and black text.
-    Supports custom fonts.
+    Supports custom fonts. Returns WebP if the client accepts it, JPEG otherwise.
     """
     # Validate file type
     if not image.content_type.startswith('image/'):
         raise HTTPException(status_code=400, detail="File must be an image")
 
-    # Get available fonts
-    fonts = discover_fonts()
-
     # Determine which font to use
     if font is None:
         # Use default
-        font = "opensans" if "opensans" in fonts else (list(fonts.keys())[0] if fonts else "opensans")
-        print(f"No font specified, using default: {font}")
+        font = _DEFAULT_FONT
     else:
-        print(f"Font requested: {font}")
         # Validate font
-        if font not in fonts:
+        if font not in _FONT_SET:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid font '{font}'. Available fonts: {', '.join(fonts.keys())}. Use /fonts endpoint to see all available fonts."
+                detail=f"Invalid font '{font}'. Available fonts: {_FONT_NAMES_CSV}. Use /fonts endpoint to see all available fonts."
             )
 
+    # Serve WebP to clients that accept it
+    if accepts_media_type(request.headers.get("accept", ""), "image/webp"):
+        output_format, media_type, extension = "WEBP", "image/webp", ".webp"
+    else:
+        output_format, media_type, extension = "JPEG", "image/jpeg", ".jpg"
+    filename = f"overlay_{Path(image.filename).stem}{extension}"
+
     try:
-        # Read the uploaded image
-        image_data = await image.read()
-        img = Image.open(io.BytesIO(image_data))
+        # Decode straight from the upload's spooled temporary file, on a worker
+        # thread so the event loop keeps serving other requests meanwhile
+        img_bytes = await asyncio.get_running_loop().run_in_executor(
+            _executor, render_overlay, image.file, quote, attribution, font, output_format
+        )
 
-        # Add the translucent box with text
-        result_img = add_translucent_box_with_text(img, quote, attribution, font)
-
-        # Convert back to RGB for JPEG output
-        if result_img.mode == 'RGBA':
-            # Create white background
-            background = Image.new('RGB', result_img.size, (255, 255, 255))
-            background.paste(result_img, mask=result_img.split()[3])  # Use alpha channel as mask
-            result_img = background
-
-        # Save to bytes
-        img_byte_arr = io.BytesIO()
-        result_img.save(img_byte_arr, format='JPEG', quality=95)
-        img_byte_arr.seek(0)
-
-        # Return the image
-        return StreamingResponse(
-            img_byte_arr,
-            media_type="image/jpeg",
+        # Return the image in a single send with a known Content-Length
+        return Response(
+            content=img_bytes,
+            media_type=media_type,
             headers={
-                "Content-Disposition": f"attachment; filename=overlay_{image.filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "Vary": "Accept"
             }
         )
 
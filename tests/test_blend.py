@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+import main
+
+
+@pytest.fixture(params=["compiled", "numpy"])
+def blend_path(request, monkeypatch):
+    """Run each test against the Numba kernel (when installed) and the NumPy fallback."""
+    if request.param == "compiled":
+        if main._blend_box is None:
+            pytest.skip("numba is not installed")
+    else:
+        monkeypatch.setattr(main, "_blend_box", None)
+    return request.param
+
+
+@pytest.mark.parametrize("color, alpha", [
+    ((128, 128, 128), 153),
+    ((255, 0, 10), 77),
+    ((0, 0, 0), 255),
+    ((200, 200, 200), 0),
+    ((12, 250, 99), 1),
+])
+def test_blend_matches_alpha_composite(blend_path, color, alpha):
+    rng = np.random.default_rng(0)
+    src = rng.integers(0, 256, size=(37, 53, 3), dtype=np.uint8)
+    overlay = Image.new('RGBA', (53, 37), color + (alpha,))
+    expected = np.asarray(Image.alpha_composite(Image.fromarray(src).convert('RGBA'), overlay).convert('RGB'))
+
+    roi = src.copy()
+    main._blend_const_grey(roi, color=color, alpha=alpha)
+
+    np.testing.assert_array_equal(roi, expected)
+
+
+def test_blend_writes_through_a_view(blend_path):
+    arr = np.full((10, 10, 3), 255, dtype=np.uint8)
+    main._blend_const_grey(arr[2:5, 3:7])
+
+    assert (arr[2:5, 3:7] == 179).all()
+    assert (arr[:2] == 255).all() and (arr[:, :3] == 255).all()
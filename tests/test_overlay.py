@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+
+TEST_IMAGE = Path(__file__).parent.parent / "TestImage.png"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def post_overlay(client, accept):
+    return client.post(
+        "/overlay",
+        files={"image": ("TestImage.png", TEST_IMAGE.read_bytes(), "image/png")},
+        data={"quote": "The quick brown fox jumps over the lazy dog", "attribution": "Somebody"},
+        headers={"Accept": accept},
+    )
+
+
+@pytest.mark.parametrize("accept, content_type, filename", [
+    ("image/avif,image/webp,*/*", "image/webp", "overlay_TestImage.webp"),
+    ("*/*", "image/jpeg", "overlay_TestImage.jpg"),
+    ("image/webp;q=0, */*", "image/jpeg", "overlay_TestImage.jpg"),
+])
+def test_overlay_format_follows_accept(client, accept, content_type, filename):
+    response = post_overlay(client, accept)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == content_type
+    assert response.headers["vary"] == "Accept"
+    assert response.headers["content-disposition"] == f"attachment; filename={filename}"
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("image/webp", True),
+    ("text/html, IMAGE/WEBP;q=0.8", True),
+    ("image/webp;q=0", False),
+    ("image/webp; q=0.000, */*", False),
+    ("*/*", False),
+    ("image/*", False),
+    ("", False),
+])
+def test_accepts_media_type(accept, expected):
+    assert main.accepts_media_type(accept, "image/webp") is expected
+
+
+def test_array_overlay_matches_image_overlay():
+    with Image.open(TEST_IMAGE) as source:
+        image = source.convert("RGB")
+    arr = np.array(image)
+    quote, attribution = "The quick brown fox jumps over the lazy dog", "Somebody"
+
+    main.add_translucent_box_with_text_array(arr, quote, attribution)
+    expected = main.add_translucent_box_with_text(image, quote, attribution)
+
+    assert np.array_equal(arr, np.asarray(expected))